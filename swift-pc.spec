@@ -8,7 +8,7 @@ a = Analysis(
     pathex=['.'],
     binaries=[],
     datas=[('assets/logo.png', 'assets')], 
-    hiddenimports=['swift_2', 'swift_connect', 'swift_shared'],
+    hiddenimports=['swift_2', 'swift_connect', 'swift_shared', 'swift_alarm', 'swift_stream', 'swift_sessions'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -7,6 +7,8 @@ import json, re, csv
 import subprocess, sys, os
 import swift_connect
 import swift_shared
+import swift_stream
+import swift_sessions
 import platform
 import time
 import swift_2
@@ -23,10 +25,11 @@ from PySide6.QtWidgets import (
     QGridLayout,
     QSizePolicy,
     QMessageBox,
+    QInputDialog,
 )
 from datetime import datetime
 from PySide6.QtGui import QPixmap, QFontDatabase, QFont
-from PySide6.QtCore import QTimer, Qt
+from PySide6.QtCore import QTimer, Qt, QEvent
 from swift_shared import latest_data
 from pathlib import Path
 from swift_2 import DisplayWindow
@@ -120,6 +123,12 @@ class ConnectionWindow(QWidget):
         self.load_saved_devices()
         self.device_list.itemSelectionChanged.connect(self.on_selection_changed)
 
+        # Optional LAN live stream for other screens
+        self.stream_server = None
+        if swift_shared.stream_port:
+            self.stream_server = swift_stream.StreamServer(port=swift_shared.stream_port)
+            self.stream_server.start()
+
 
     def save_found_devices(self):
         if not self.found_devices:
@@ -186,7 +195,8 @@ class ConnectionWindow(QWidget):
             self.progress_timer.stop()
 
     def update_status(self):
-        self.status_label.setText(swift_shared.connection_status)
+        if self.status_label.text() != swift_shared.connection_status:
+            self.status_label.setText(swift_shared.connection_status)
 
         # launch chart window once, when connection flag turns true
         if swift_shared.is_connected and not self.display_launched:
@@ -200,6 +210,24 @@ class ConnectionWindow(QWidget):
                 self.device_list.addItem(f"{name} (...{short}) ({rssi} dB)")
             swift_shared.scan_done = False
 
+    def _set_status_rate(self):
+        # Poll slowly while nobody can see the status line
+        hidden = not self.isVisible() or self.isMinimized()
+        self.status_timer.setInterval(2000 if hidden else 500)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._set_status_rate()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._set_status_rate()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self._set_status_rate()
+
     def on_selection_changed(self):
         idx = self.device_list.currentRow()
         if idx >= 0:
@@ -248,19 +276,29 @@ class ConnectionWindow(QWidget):
         import swift_shared
 
         try:
-            # 1) Locate the session log
-            recording_file = swift_shared.SESSION_LOG
+            # 1) Pick a session from the catalog (newest first)
+            sessions = swift_sessions.list_sessions()
+            if not sessions:
+                raise ValueError("No recorded sessions to export.")
+
+            def describe(e):
+                dose = e.get("total_dose") or 0.0
+                link = (e.get("link") or {}).get("completeness", "--")
+                return (f"{e['start'].replace('T', ' ')}  {e['device']}  "
+                        f"{e['samples']} samples  {dose:.4f} mSv  link {link}%")
+
+            items = [describe(e) for e in sessions]
+            choice, ok = QInputDialog.getItem(self, "Download CSV", "Session:", items, 0, False)
+            if not ok:
+                return
+            session = sessions[items.index(choice)]
+
+            # 2) Locate the session recording
+            recording_file = swift_sessions.session_path(session)
 
             if not recording_file.exists():
                 raise FileNotFoundError(f"No session log found at {recording_file}")
 
-            # 2) Read and parse JSONL (line-by-line)
-            with open(recording_file, "r", encoding="utf-8") as f:
-                data = [json.loads(line) for line in f if line.strip()]
-
-            if not data:
-                raise ValueError("No data to export.")
-
             # 3) Define CSV columns and corresponding JSON keys
             mapping = {
                 "Timestamp"      : "time",
@@ -269,22 +307,30 @@ class ConnectionWindow(QWidget):
                 "Dose_mSv"       : "dose",
                 "DoseRate_uSv_h" : "rate",
                 "Battery_%"      : "battery",
-                "Temp_C"         : "temp"
+                "Temp_C"         : "temp",
+                "Gap_s"          : "gap",
+                "Missed"         : "missed",
+                "Link_%"         : "link",
+                "Alarm"          : "alarm",
             }
             headers = list(mapping.keys())
 
             # 4) Output path
             out_fname = (
                 Path.home() / "Downloads" /
-                f"atom_data_{datetime.now():%Y%m%d_%H%M}.csv"
+                f"atom_data_{session['id']}.csv"
             )
             out_fname.parent.mkdir(parents=True, exist_ok=True)
 
-            # 5) Write CSV
-            with open(out_fname, "w", newline="") as csvfile:
+            # 5) Stream JSONL rows straight into the CSV
+            with open(recording_file, "r", encoding="utf-8") as f, \
+                 open(out_fname, "w", newline="") as csvfile:
                 writer = csv.DictWriter(csvfile, fieldnames=headers)
                 writer.writeheader()
-                for row in data:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
                     writer.writerow({
                         col: row.get(json_key, "")
                         for col, json_key in mapping.items()
@@ -8,9 +8,10 @@ import json, time
 import swift_shared 
 import asyncio
 
+from collections import deque
 from swift_shared import logging
 from pathlib import Path
-from PySide6.QtCore    import Qt, QTimer, QPointF
+from PySide6.QtCore    import Qt, QTimer, QPointF, QObject, QEvent, Signal
 from PySide6.QtGui     import QColor, QPainter, QFont, QPixmap, QFontDatabase
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QGridLayout, QLabel, QFrame
 from PySide6.QtCharts  import QChart, QChartView, QLineSeries, QValueAxis
@@ -18,6 +19,12 @@ from PySide6.QtCharts  import QChart, QChartView, QLineSeries, QValueAxis
 DATA_DIR    = Path(swift_shared.DATA_DIR)
 LATEST_PATH = DATA_DIR / "latest_data.json"
 
+# ------------------------------------------------------------------- #
+class _SampleBridge(QObject):
+    """Carries samples from the BLE thread into the Qt GUI thread."""
+    sample = Signal(object)
+
+
 # ------------------------------------------------------------------- #
 class DisplayWindow(QWidget):
     def __init__(self, on_close=None) -> None:
@@ -27,31 +34,39 @@ class DisplayWindow(QWidget):
         self.resize(960, 600)
 
         # --- strip-chart parameters ---------------------------------
-        self.t_seconds  = 0           # current sample time (s)
+        self.t_seconds  = 0           # time of the newest sample (s)
         self.window_sec = 300         # width of x-axis (5 min)
-        self.window_pts = self.window_sec // 2   # timer = 2 s → 150 pts
-        self.y_buf: list[float] = []  # ring-buffer of CPS values
-        self.counts_buf: list[int] = []
+        self.window_pts = self.window_sec // 2   # 2 s packets → 150 pts
+        self.y_buf: deque[float] = deque(maxlen=self.window_pts)  # CPS values
+        self.x_buf: deque[int]   = deque(maxlen=self.window_pts)  # their times (s)
+        self.counts_buf: deque[int] = deque(maxlen=30)            # last 60 s
         self.last_total_counts = 0
+        self.latest: dict = {}
+        self.dirty = False            # samples arrived since last redraw
+        self.frame_ms = 100           # at most one redraw per frame
 
         # ---------- Qt Charts setup ---------------------------------
         vbox  = QVBoxLayout(self)
 
         # ——— ADD THIS HEADING ———
-        heading = QLabel(f"AtomConnect - Bluetooth Radiation Monitor v{swift_shared.version}")
-        heading.setStyleSheet("""
-            background-color: rgb(0, 102, 209);
+        self.title = f"AtomConnect - Bluetooth Radiation Monitor v{swift_shared.version}"
+        self.heading_style = """
+            background-color: %s;
             margin-left: 5px;
             margin-right: 5px;
             padding: 5px;
             color: white;
-        """)
+        """
+        heading = QLabel(self.title)
+        heading.setStyleSheet(self.heading_style % "rgb(0, 102, 209)")
         font    = QFont()
         font.setPointSize(20)
         font.setBold(True)
         heading.setFont(font)
         heading.setAlignment(Qt.AlignCenter)
         vbox.addWidget(heading)
+        self.heading     = heading
+        self.alarm_shown = False
 
         # ---------- layouts -----------------------------------------
         
@@ -108,7 +123,8 @@ class DisplayWindow(QWidget):
             ("📈 CPM", "cpm"), ("🎯 CPS", "cps"), ("☢️ Dose (mSv)", "dose"),
             ("🔄 Dose Rate (µSv/h)", "rate"), ("🔋 Battery (%)", "battery"),
             ("🌡️ Temp (°C)", "temp"), ("⏱️ Timestamp", "time"),
-            ("🧮 Counts", "counts")
+            ("🧮 Counts", "counts"), ("📶 Link (%)", "link"),
+            ("❗ Missed", "missed_total"),
         ]
         self.labels = {}
         for i, (title, key) in enumerate(fields):
@@ -133,21 +149,35 @@ class DisplayWindow(QWidget):
         footer.setWordWrap(True)
         vbox.addWidget(footer)
     
-        # ---------- timer -------------------------------------------
-        timer = QTimer(self)
-        timer.timeout.connect(self.update_data)
-        timer.start(2_000)            # every 2 s
+        # ---------- redraw on new data ------------------------------
+        # Samples are pushed from the BLE thread; a single-shot timer
+        # coalesces bursts into one redraw per frame, and nothing is
+        # redrawn while the window is hidden or minimised.
+        self.redraw_timer = QTimer(self)
+        self.redraw_timer.setSingleShot(True)
+        self.redraw_timer.timeout.connect(self.redraw)
+
+        self.bridge = _SampleBridge(self)
+        self.bridge.sample.connect(self.update_data)
+        self.push_sample = self.bridge.sample.emit    # safe to call from any thread
+        swift_shared.sample_listeners.append(self.push_sample)
 
     # ----------------------------------------------------------------
-    def update_data(self) -> None:
-        # -------- read JSON ----------------------------------------
-        try:
-            data = json.loads(LATEST_PATH.read_text())
-        except Exception as e:
-            logging.info(f"[UI] JSON read error:{e}")
-            return
+    def update_data(self, data: dict | None = None) -> None:
+        """Ingest one sample and schedule a redraw.
+
+        Without *data* the latest snapshot is read from LATEST_PATH, which
+        is how the window is fed when run on its own.
+        """
+        if data is None:
+            try:
+                data = json.loads(LATEST_PATH.read_text())
+            except Exception as e:
+                logging.info(f"[UI] JSON read error:{e}")
+                return
         if not data:
             return
+        data = dict(data)
 
         # Get total counts since start
         total_counts = int(data.get("counts", 0) or 0)
@@ -156,64 +186,96 @@ class DisplayWindow(QWidget):
         delta_counts = total_counts - self.last_total_counts
         self.last_total_counts = total_counts  # update for next time
 
-        # Append delta to buffer
+        # Append delta to buffer (last 60 seconds at 2s interval)
         self.counts_buf.append(delta_counts)
-        if len(self.counts_buf) > 30:  # last 60 seconds at 2s interval
-            self.counts_buf.pop(0)
 
         # Compute true rolling CPM
         data["cpm"] = sum(self.counts_buf)
 
         # Update other fields
         data["status"] = "Live"
-        data["time"]   = time.strftime("%H:%M:%S")
+        data.setdefault("time", time.strftime("%H:%M:%S"))
         cps = float(data.get("cps", 0) or 0)
 
+        # Missed samples (see swift_connect.record_arrival) take up chart time
+        if self.x_buf:
+            self.t_seconds += 2 * (1 + int(data.get("missed", 0) or 0))
+        self.x_buf.append(self.t_seconds)
+        self.y_buf.append(cps)
+        self.latest = data
+
+        self.dirty = True
+        if self.isVisible() and not self.isMinimized() and not self.redraw_timer.isActive():
+            self.redraw_timer.start(self.frame_ms)
+
+    # ----------------------------------------------------------------
+    def redraw(self) -> None:
+        if not self.dirty:
+            return
+        self.dirty = False
+        data = self.latest
+        t_now = self.t_seconds        # time of the newest sample
+
+        # -------- alarm banner ------------------------------------
+        alarm = bool(data.get("alarm"))
+        if alarm != self.alarm_shown:
+            self.alarm_shown = alarm
+            if alarm:
+                bg = data.get("background_cps")
+                self.heading.setText(f"🚨 ALARM — CPS above background ({bg} cps)")
+                self.heading.setStyleSheet(self.heading_style % "rgb(200, 0, 0)")
+            else:
+                self.heading.setText(self.title)
+                self.heading.setStyleSheet(self.heading_style % "rgb(0, 102, 209)")
+
         # -------- numeric grid ------------------------------------
         for key, lbl in self.labels.items():
             val = data.get(key, "--")
             try:
                 if key in {"dose", "rate"}:
                     val = f"{float(val):.3f}"
-                elif key in {"cps", "cpm"}:
+                elif key in {"cps", "cpm", "link"}:
                     val = f"{float(val):.1f}"
+                elif val is None:
+                    val = "--"
             except (ValueError, TypeError):
                 pass
             lbl.setText(str(val))
 
         # -------- update trace ------------------------------------
-        # 1) append new CPS value
-        self.y_buf.append(cps)
-        if len(self.y_buf) > self.window_pts:
-            self.y_buf.pop(0)
-
-        # 2) build matching X values (fixed 300-s width)
-        right  = self.t_seconds
-        left   = max(0, right - self.window_sec)
-        xs = list(range(right - 2*(len(self.y_buf)-1), right+1, 2))
+        # 1) X values are the recorded sample times, so gaps stay visible
+        xs = self.x_buf
         ys = self.y_buf
 
-        # after you’ve rebuilt the series …
         y_max = max(ys) if ys else 1        # ys = current CPS values in window
-        self.y_axis.setRange(0, y_max * 1.1)  # 10 % head-room
+        self.y_axis.setRange(0, (y_max or 1) * 1.1)  # 10 % head-room
 
-        # 3) redraw series (≤150 points → trivial)
-        self.series.clear()
-        for x, y in zip(xs, ys):
-            self.series.append(QPointF(x, y))
+        # 2) swap all points in one call (one repaint instead of ≤150)
+        self.series.replace([QPointF(x, y) for x, y in zip(xs, ys)])
 
         # keep a fixed 300-s span; start with 0-300, then slide
-        if self.t_seconds < self.window_sec:
+        if t_now < self.window_sec:
             left, right = 0, self.window_sec
         else:
-            left, right = self.t_seconds - self.window_sec, self.t_seconds
+            left, right = t_now - self.window_sec, t_now
         self.x_axis.setRange(left, right)
 
+    # ----------------------------------------------------------------
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.redraw()                 # catch up on samples buffered while hidden
 
-        self.t_seconds += 2           # next sample time
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange and not self.isMinimized():
+            self.redraw()
 
     def closeEvent(self, event):
         logging.info("[UI] Window close requested — setting shutdown flags")
+        try:
+            swift_shared.sample_listeners.remove(self.push_sample)
+        except ValueError:
+            pass
         swift_shared.stop_request       = True
         swift_shared.shutdown_request   = True
         swift_shared.is_connected       = False
@@ -232,4 +294,9 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     win = DisplayWindow()
     win.show()
+
+    # Stand-alone: no BLE thread pushes samples, so follow latest_data.json
+    poll = QTimer(win)
+    poll.timeout.connect(win.update_data)
+    poll.start(2_000)
     sys.exit(app.exec())
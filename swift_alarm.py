@@ -0,0 +1,195 @@
+# swift_alarm.py — streaming step detector on the CPS stream
+#
+# A one-sided Poisson CUSUM compares every 2-s count against a slowly
+# learned background rate. Each sample costs O(1).
+#
+# How fast a step is caught depends on how many counts the background
+# gives per sample. Median delay in 2-s samples with the defaults
+# (1 false alarm/day, tuned for a 1.5× step), from simulation:
+#
+#     background     1.5× step    2× step    3× step
+#       0.5 cps          ~90         ~35        ~16
+#       1 cps            ~48         ~16         ~8
+#       3 cps            ~16          ~6         ~3
+#       10 cps            ~5          ~2          1
+#
+# So "within a few samples" only holds from roughly 10 cps, or for large
+# steps. On low-background units, accept more false alarms
+# (ATOMCONNECT_FALSE_ALARMS_PER_DAY) or tune for a bigger step
+# (ATOMCONNECT_ALARM_STEP_RATIO); both are read in swift_shared and
+# checked here, falling back to the defaults below if invalid.
+
+import math
+import time
+import swift_shared
+
+from collections import deque
+
+from swift_shared import logging
+
+
+SAMPLE_SEC           = 2.0    # one packet every 2 s
+FALSE_ALARMS_PER_DAY = 1.0    # default target false-alarm rate under background
+STEP_RATIO           = 1.5    # default rate increase the detector is tuned for
+WARMUP_SAMPLES       = 30     # learn background for 60 s before arming
+BACKGROUND_TAU       = 300    # background EWMA time constant (samples)
+CLEAR_SAMPLES        = 15     # samples (30 s) averaged to decide an alarm cleared
+MIN_BACKGROUND       = 0.5    # floor on counts per sample, avoids log(0)
+
+
+def threshold_for(false_alarms_per_day: float, sample_sec: float = SAMPLE_SEC) -> float:
+    """Decision threshold h for a given false-alarm rate.
+
+    Uses the Wald bound ARL0 >= exp(h): the mean run length between false
+    alarms is at least exp(h) samples.
+    """
+    samples_per_day = 86400.0 / sample_sec
+    arl0 = max(samples_per_day / max(false_alarms_per_day, 1e-9), 1.0)
+    return math.log(arl0)
+
+
+class PoissonCusum:
+    """Constant-time CUSUM for an upward step in a Poisson count rate."""
+
+    def __init__(
+        self,
+        false_alarms_per_day: float = FALSE_ALARMS_PER_DAY,
+        step_ratio: float           = STEP_RATIO,
+        warmup: int                 = WARMUP_SAMPLES,
+        tau: int                    = BACKGROUND_TAU,
+        clear_after: int            = CLEAR_SAMPLES,
+    ) -> None:
+        if not false_alarms_per_day > 0:
+            raise ValueError(f"false_alarms_per_day must be > 0, got {false_alarms_per_day}")
+        if not step_ratio > 1:
+            raise ValueError(f"step_ratio must be > 1, got {step_ratio}")
+        self.h           = threshold_for(false_alarms_per_day)
+        self.step_ratio  = step_ratio
+        self.log_ratio   = math.log(step_ratio)
+        self.warmup      = warmup
+        self.alpha       = 1.0 / tau
+        self.clear_after = clear_after
+        self.reset()
+
+    def reset(self) -> None:
+        self.n          = 0       # samples seen
+        self.background = None    # counts per sample
+        self.s          = 0.0     # CUSUM statistic
+        self.active     = False   # alarm latched
+        self.recent     = deque(maxlen=self.clear_after)   # counts while active
+
+    @property
+    def armed(self) -> bool:
+        return self.n >= self.warmup
+
+    def update(self, counts: float) -> str | None:
+        """Feed one sample's counts; returns "alarm", "clear" or None."""
+        self.n += 1
+
+        if self.background is None:
+            self.background = max(counts, MIN_BACKGROUND)
+            return None
+
+        if not self.armed:
+            # Plain running mean during warm-up
+            self.background += (counts - self.background) / self.n
+            self.background  = max(self.background, MIN_BACKGROUND)
+            return None
+
+        lam0 = self.background
+
+        if self.active:
+            # Clear once the recent mean is back below the midpoint
+            # between background and the step we alarm on.
+            self.recent.append(counts)
+            if len(self.recent) == self.clear_after:
+                mean = sum(self.recent) / self.clear_after
+                if mean < lam0 * (1.0 + self.step_ratio) / 2.0:
+                    self.active = False
+                    return "clear"
+            return None
+
+        llr    = counts * self.log_ratio - lam0 * (self.step_ratio - 1.0)
+        self.s = max(0.0, self.s + llr)
+
+        # Slow EWMA: a real step alarms long before it drags this up
+        self.background += self.alpha * (counts - self.background)
+        self.background  = max(self.background, MIN_BACKGROUND)
+
+        if self.s > self.h:
+            self.active = True
+            self.s      = 0.0
+            self.recent.clear()
+            return "alarm"
+
+        return None
+
+
+# ------------------------------------------------------------------
+
+_detectors: dict[str, PoissonCusum] = {}
+
+
+def _tuning(value, default: float, lowest: float, name: str) -> float:
+    """*value* as a float > *lowest*, else *default* with a warning."""
+    if value is None or value == "":
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if not (math.isfinite(number) and number > lowest):
+        logging.warning(f"[alarm] Ignoring {name}={value!r} (must be a number > {lowest:g}); "
+                        f"using {default:g}")
+        return default
+    return number
+
+
+def _new_detector() -> PoissonCusum:
+    return PoissonCusum(
+        false_alarms_per_day = _tuning(swift_shared.alarm_false_per_day, FALSE_ALARMS_PER_DAY,
+                                       0.0, "ATOMCONNECT_FALSE_ALARMS_PER_DAY"),
+        step_ratio           = _tuning(swift_shared.alarm_step_ratio, STEP_RATIO,
+                                       1.0, "ATOMCONNECT_ALARM_STEP_RATIO"),
+    )
+
+
+def reset_detector(address: str) -> None:
+    _detectors[address] = _new_detector()
+
+
+def check_sample(address: str, sample: dict) -> dict:
+    """Run the detector for *address* on one decoded sample.
+
+    Returns the fields to merge into the sample. Alarm and clear events
+    are logged and passed to every callable in swift_shared.alarm_listeners.
+    """
+    det = _detectors.get(address)
+    if det is None:
+        det = _detectors[address] = _new_detector()
+    cps    = float(sample.get("cps", 0) or 0)
+    result = det.update(cps * SAMPLE_SEC)
+
+    if result:
+        event = {
+            "event"         : result,
+            "address"       : address,
+            "time"          : sample.get("time", time.strftime("%H:%M:%S")),
+            "cps"           : cps,
+            "background_cps": round(det.background / SAMPLE_SEC, 3),
+        }
+        if result == "alarm":
+            logging.warning(f"[alarm] CPS step detected on {address}: {cps:.1f} cps "
+                            f"vs background {event['background_cps']:.2f} cps")
+        else:
+            logging.info(f"[alarm] Cleared on {address}")
+        for listener in list(swift_shared.alarm_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logging.warning(f"Alarm listener {listener!r} failed: {e}")
+
+    return {
+        "alarm"         : det.active,
+        "background_cps": round(det.background / SAMPLE_SEC, 3) if det.armed else None,
+    }
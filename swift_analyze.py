@@ -0,0 +1,205 @@
+# swift_analyze.py — summarise many recordings in parallel
+#
+#   python swift_analyze.py [DIR ...] [--workers N] [--json]
+#
+# Scans DIR (default: the app's sessions folder) for *.jsonl recordings as
+# written by swift_connect.save_latest_data, summarises each file in a
+# process pool with NumPy, and prints one line per file as soon as it is
+# done, followed by an aggregate over all files. Only one file per worker
+# is held in memory at a time.
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+PACKET_INTERVAL = 2.0      # seconds between samples
+GAP_TOLERANCE   = 1.5      # same rule as swift_connect: > 3 s is a gap
+FIELDS          = ("time", "cps", "dose", "battery", "missed")
+
+
+def _seconds_of_day(hms: str) -> float:
+    try:
+        h, m, s = hms.split(":")
+        return int(h) * 3600 + int(m) * 60 + float(s)
+    except (AttributeError, ValueError):
+        return np.nan
+
+
+def _num(v) -> float:
+    """*v* if it is a real number, else NaN (bools and strings included)."""
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return v
+    return np.nan
+
+
+def _positive_int(text: str) -> int:
+    n = int(text)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+
+def summarise_file(path: str) -> dict:
+    """Summary of one recording; runs in a worker process."""
+    times, cps, dose, battery, missed = [], [], [], [], []
+    bad_lines = 0
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                bad_lines += 1
+                continue
+            if not isinstance(row, dict):
+                bad_lines += 1
+                continue
+            # Missing fields are fine (older recordings); present but
+            # unusable ones make the row count as bad, but keep the sample
+            fields = [_seconds_of_day(row.get("time"))] + [_num(row.get(k)) for k in FIELDS[1:]]
+            if any(np.isnan(v) and row.get(k) is not None for k, v in zip(FIELDS, fields)):
+                bad_lines += 1
+            for column, v in zip((times, cps, dose, battery, missed), fields):
+                column.append(v)
+
+    n = len(times)
+    result = {"file": str(path), "samples": n, "bad_lines": bad_lines}
+    if n == 0:
+        return result
+
+    t       = np.asarray(times,   dtype=float)
+    cps     = np.asarray(cps,     dtype=float)
+    dose    = np.asarray(dose,    dtype=float)
+    battery = np.asarray(battery, dtype=float)
+    missed  = np.asarray(missed,  dtype=float)
+
+    # Recordings only carry HH:MM:SS, so unwrap midnight crossings
+    dt = np.diff(t)
+    dt = np.where(dt < 0, dt + 86400, dt)
+    elapsed = np.concatenate(([0.0], np.nancumsum(dt)))
+
+    # Prefer the recorded per-sample miss count; infer from timestamps otherwise
+    if np.isfinite(missed).any():
+        gaps          = int(np.count_nonzero(np.nan_to_num(missed) > 0))
+        missed_total  = int(np.nansum(missed))
+    else:
+        long          = dt > PACKET_INTERVAL * GAP_TOLERANCE
+        gaps          = int(np.count_nonzero(long))
+        missed_total  = int(np.sum(np.maximum(np.round(dt[long] / PACKET_INTERVAL) - 1, 1)))
+
+    finite_dose = dose[np.isfinite(dose)]
+    total_dose  = float(max(finite_dose[-1] - finite_dose[0], 0.0)) if finite_dose.size else None
+
+    # Battery drain as the slope of a least-squares line, in % per hour
+    ok = np.isfinite(battery) & np.isfinite(elapsed)
+    drain = None
+    if np.count_nonzero(ok) >= 2 and np.ptp(elapsed[ok]) > 0:
+        slope = np.polyfit(elapsed[ok] / 3600.0, battery[ok], 1)[0]
+        drain = round(float(-slope), 3)
+
+    duration = float(elapsed[-1])
+    result.update({
+        "duration_s"       : round(duration, 1),
+        "total_dose"       : round(total_dose, 6) if total_dose is not None else None,
+        "mean_cps"         : round(float(np.nanmean(cps)), 3) if np.isfinite(cps).any() else None,
+        "max_cps"          : round(float(np.nanmax(cps)), 3) if np.isfinite(cps).any() else None,
+        "gaps"             : gaps,
+        "missed"           : missed_total,
+        "completeness"     : round(100.0 * n / (n + missed_total), 1),
+        "battery_drain_pph": drain,
+    })
+    return result
+
+
+def _aggregate(results: list[dict], failed: int = 0) -> dict:
+    valid    = [r for r in results if r["samples"]]
+    samples  = sum(r["samples"] for r in valid)
+    missed   = sum(r["missed"] for r in valid)
+    cps_w    = [(r["mean_cps"], r["samples"]) for r in valid if r["mean_cps"] is not None]
+    drains   = [r["battery_drain_pph"] for r in valid if r["battery_drain_pph"] is not None]
+    return {
+        "files"            : len(results) + failed,
+        "failed"           : failed,
+        "samples"          : samples,
+        "duration_s"       : round(sum(r["duration_s"] for r in valid), 1),
+        "total_dose"       : round(sum(r["total_dose"] or 0.0 for r in valid), 6),
+        "mean_cps"         : round(sum(c * n for c, n in cps_w) / sum(n for _, n in cps_w), 3) if cps_w else None,
+        "max_cps"          : max((r["max_cps"] for r in valid if r["max_cps"] is not None), default=None),
+        "gaps"             : sum(r["gaps"] for r in valid),
+        "missed"           : missed,
+        "completeness"     : round(100.0 * samples / (samples + missed), 1) if samples else None,
+        "battery_drain_pph": round(float(np.median(drains)), 3) if drains else None,
+    }
+
+
+def _format(r: dict) -> str:
+    if not r["samples"]:
+        return f"{Path(r['file']).name:<40} (empty)"
+    return (f"{Path(r['file']).name:<40} {r['samples']:>7} samples  "
+            f"{r['duration_s'] / 3600:7.2f} h  dose {r['total_dose'] or 0:.4f} mSv  "
+            f"cps {r['mean_cps'] or 0:.2f}/{r['max_cps'] or 0:.2f}  "
+            f"gaps {r['gaps']} ({r['completeness']}%)  "
+            f"battery {r['battery_drain_pph'] if r['battery_drain_pph'] is not None else '--'} %/h")
+
+
+def find_recordings(dirs: list[str]) -> list[str]:
+    files = []
+    for d in dirs:
+        files.extend(str(p) for p in sorted(Path(d).rglob("*.jsonl")))
+    return files
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarise AtomConnect recordings in parallel.")
+    parser.add_argument("dirs", nargs="*", help="directories to scan (default: sessions folder)")
+    parser.add_argument("--workers", type=_positive_int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--json", action="store_true", help="print JSON lines instead of text")
+    args = parser.parse_args(argv)
+
+    if not args.dirs:
+        import swift_shared
+        args.dirs = [str(swift_shared.SESSIONS_DIR)]
+
+    files = find_recordings(args.dirs)
+    if not files:
+        print("No recordings found.", file=sys.stderr)
+        return 1
+
+    results = []
+    failed  = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(summarise_file, f): f for f in files}
+        for fut in as_completed(futures):
+            try:
+                r = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"⚠️ {futures[fut]}: {e}", file=sys.stderr)
+                continue
+            results.append(r)
+            print(json.dumps(r) if args.json else _format(r), flush=True)
+
+    total = _aggregate(results, failed)
+    if args.json:
+        print(json.dumps({"aggregate": total}))
+    else:
+        print("-" * 80)
+        print(f"{total['files']} files ({total['failed']} failed), {total['samples']} samples, "
+              f"{total['duration_s'] / 3600:.2f} h, dose {total['total_dose']:.4f} mSv, "
+              f"mean cps {total['mean_cps']}, max cps {total['max_cps']}, "
+              f"gaps {total['gaps']} ({total['completeness']}%), "
+              f"median battery drain {total['battery_drain_pph']} %/h")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
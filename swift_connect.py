@@ -7,6 +7,8 @@ import time
 import datetime
 import struct
 import swift_shared
+import swift_alarm
+import swift_sessions
 import json
 
 from bleak.exc import BleakError
@@ -16,6 +18,10 @@ from swift_shared import logging
 
 NOTIFY_UUID  = "70bc767e-7a1a-4304-81ed-14b9af54f7bd"
 RETRY_DELAY  = 1           # seconds between scan cycles
+PACKET_INTERVAL = 2.0      # device sends one packet every ~2 s
+GAP_TOLERANCE   = 1.5      # interval > 1.5 × PACKET_INTERVAL counts as a gap
+SCAN_RSSI_MAX_AGE = 600    # s; older scan RSSI is left out of the session summary
+link_clock      = time.monotonic   # arrival clock; swift_soak swaps in simulated time
 
 
 # Global to store the last count value for CPS calculation
@@ -24,14 +30,28 @@ last_time = None
 
 # ------------------------------------------------------------------
 def _handle_notification(_sender: int, payload: bytearray) -> None:
-    parsed = decode_swift_packet(payload)
+    address = swift_shared.selected_device_address
+    parsed  = decode_swift_packet(payload)
     if not parsed:
+        record_invalid_packet(address)
         return
+    parsed.update(record_arrival(address))
+    parsed.update(swift_alarm.check_sample(address, parsed))
     save_latest_data(parsed)    
     store = swift_shared.latest_data
-    store.setdefault("timestamps", []).append(time.strftime("%H:%M:%S"))
-    store.setdefault("cps_history", []).append(parsed.get("cps", 0))
+    store["timestamps"].append(time.strftime("%H:%M:%S"))
+    store["cps_history"].append(parsed.get("cps", 0))
     store["data"] = parsed
+    _publish(parsed)
+
+
+def _publish(sample: dict) -> None:
+    # Listeners run on the BLE thread and must hand off anything slow
+    for listener in list(swift_shared.sample_listeners):
+        try:
+            listener(sample)
+        except Exception as e:
+            logging.warning(f"Sample listener {listener!r} failed: {e}")
     
     
 
@@ -47,6 +67,7 @@ async def scan_for_devices(timeout=1, prefix="atom"):
         if device.name and device.name.lower().startswith(prefix):
             if device.address not in found and advertisement_data.rssi > -70:
                 found[device.address] = (device.name, device.address, advertisement_data.rssi)
+                record_scan_rssi(device.address, advertisement_data.rssi)
                 swift_shared.connection_status = f"👉 Found {device.name} (RSSI: {advertisement_data.rssi} dBm)"
 
     swift_shared.connection_status = f"🔍 Scanning for devices (~{int(timeout)} sec.)"
@@ -88,14 +109,23 @@ def connect_to_device():
     async def _connect():
         max_attempts = 10
         delay_between_attempts = 2.5
+        session_started = False     # reconnects continue the same recording
+        session_id      = None
 
         try:
+            # New user-initiated session; automatic reconnects below keep the
+            # stats so the outage shows up as missed intervals. Inside the try
+            # so `connecting` is cleared even if a reset fails.
+            reset_link_stats(address)
+            swift_alarm.reset_detector(address)
+
             for attempt in range(1, max_attempts + 1):
                 if swift_shared.stop_request:
                     swift_shared.connection_status = "🔴 Disconnected by user"
                     break
 
                 swift_shared.connection_status = f"🔌 Attempt {attempt}/{max_attempts} to connect to {name}"
+                logging.info(swift_shared.connection_status, extra={"rate_key": "connect-attempt"})
                 try:
                     client = BleakClient(address)
                     swift_shared.is_connected = False
@@ -109,8 +139,9 @@ def connect_to_device():
                     swift_shared.client       = client
                     swift_shared.is_connected = True
 
-                    # Clear previous session log
-                    swift_shared.SESSION_LOG.write_text("")
+                    if not session_started:
+                        session_id      = swift_sessions.start_session(name, address)
+                        session_started = True
                     swift_shared.connection_status = f"✅ Connected to {name}"
 
                     # Keep connection alive
@@ -127,14 +158,17 @@ def connect_to_device():
                         break
                     else:
                         swift_shared.connection_status = "⚠️ Connection lost, retrying..."
+                        logging.warning(swift_shared.connection_status, extra={"rate_key": "connect-lost"})
                         await asyncio.sleep(delay_between_attempts)
 
                 except BleakError as e:
                     swift_shared.connection_status = f"⚠️ Attempt {attempt}, error: {str(e)}"
+                    logging.warning(swift_shared.connection_status, extra={"rate_key": "connect-error"})
                     await asyncio.sleep(delay_between_attempts)
 
                 except Exception as e:
                     swift_shared.connection_status = f"⚠️ Attempt {attempt}, unexpected error: {str(e)}"
+                    logging.warning(swift_shared.connection_status, extra={"rate_key": "connect-error"})
                     await asyncio.sleep(delay_between_attempts)
 
             # Final status
@@ -145,6 +179,8 @@ def connect_to_device():
 
         finally:
             swift_shared.connecting = False
+            if session_started:
+                swift_sessions.end_session(session_id)
             # DO NOT reset stop_request here — the check above needs it
 
 
@@ -162,7 +198,8 @@ def decode_swift_packet(data: bytes):
     global last_counts, last_time
 
     if len(data) != 13:
-        print("⚠️ Invalid packet length")
+        logging.warning(f"Invalid packet length {len(data)} (expected 13)",
+                        extra={"rate_key": "invalid-packet"})
         return None
 
     now = datetime.datetime.now()
@@ -192,20 +229,106 @@ def decode_swift_packet(data: bytes):
     }
 
 
+# ------------------Link quality-------------------------------------
+
+def _link_entry(address: str) -> dict:
+    return swift_shared.link_stats.setdefault(address, {
+        "started"     : time.time(),
+        "received"    : 0,      # valid packets
+        "missed"      : 0,      # expected packets that never arrived
+        "invalid"     : 0,      # packets rejected by decode_swift_packet
+        "last_arrival": None,   # monotonic time of the last valid packet
+        "max_gap"     : 0.0,    # longest inter-arrival time (s)
+        "scan_rssi"   : None,   # advertised RSSI from a scan in this run (dB)
+        "scan_time"   : None,   # wall-clock time of that scan reading
+    })
+
+
+def reset_link_stats(address: str) -> None:
+    # Bleak cannot read RSSI on a live connection on every backend, so the
+    # only RSSI we have is the advertisement seen before connecting; keep it.
+    old = swift_shared.link_stats.pop(address, {})
+    stats = _link_entry(address)
+    stats["scan_rssi"] = old.get("scan_rssi")
+    stats["scan_time"] = old.get("scan_time")
+
+
+def link_completeness(stats: dict) -> float:
+    """Percentage of expected packets that were actually received."""
+    expected = stats["received"] + stats["missed"]
+    return 100.0 * stats["received"] / expected if expected else 100.0
+
+
+def record_arrival(address: str, now: float | None = None) -> dict:
+    """Update inter-arrival stats for one valid packet.
+
+    Returns the per-sample fields that go into the recording: the gap since
+    the previous packet, how many intervals were missed in that gap, and the
+    running session totals.
+    """
+    stats = _link_entry(address)
+    now   = link_clock() if now is None else now
+
+    gap    = 0.0
+    missed = 0
+    if stats["last_arrival"] is not None:
+        gap = now - stats["last_arrival"]
+        if gap > PACKET_INTERVAL * GAP_TOLERANCE:
+            missed = max(1, round(gap / PACKET_INTERVAL) - 1)
+            logging.warning(f"Gap of {gap:.1f} s from {address}: {missed} sample(s) missed",
+                            extra={"rate_key": f"gap-{address}"})
+        stats["max_gap"] = max(stats["max_gap"], gap)
+
+    stats["last_arrival"] = now
+    stats["received"]    += 1
+    stats["missed"]      += missed
+
+    return {
+        "gap"         : round(gap, 2),
+        "missed"      : missed,
+        "missed_total": stats["missed"],
+        "invalid"     : stats["invalid"],
+        "link"        : round(link_completeness(stats), 1),
+    }
+
+
+def record_invalid_packet(address: str) -> None:
+    _link_entry(address)["invalid"] += 1
+
+
+def record_scan_rssi(address: str, rssi: int) -> None:
+    stats = _link_entry(address)
+    stats["scan_rssi"] = rssi
+    stats["scan_time"] = time.time()
+
+
+def link_summary(address: str) -> dict:
+    """Session-level link quality for *address*, suitable for display or export."""
+    stats = _link_entry(address)
+    fresh = (stats["scan_time"] is not None
+             and stats["started"] - stats["scan_time"] <= SCAN_RSSI_MAX_AGE)
+    return {
+        "received"    : stats["received"],
+        "missed"      : stats["missed"],
+        "invalid"     : stats["invalid"],
+        "completeness": round(link_completeness(stats), 1),
+        "max_gap"     : round(stats["max_gap"], 2),
+        "scan_rssi"   : stats["scan_rssi"] if fresh else None,
+    }
+
+
 # ------------------------------------------------------------------
 def save_latest_data(data):
     latest_path = swift_shared.DATA_DIR / "latest_data.json"
-    session_log = swift_shared.DATA_DIR / "recording.jsonl"
 
     # Save snapshot for UI
     with open(latest_path, "w") as f:
         json.dump(data, f, indent=2)
 
-    # Append single line to session log
-    with open(session_log, "a", encoding="utf-8") as f:
-        f.write(json.dumps(data) + "\n")
+    # Append single line to the current session's recording
+    swift_sessions.append(data)
 
 
 
 # Make latest_data importable
-__all__ = ['decode_swift_packet', 'latest_data']
+__all__ = ['decode_swift_packet', 'latest_data', 'link_summary']
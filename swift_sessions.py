@@ -0,0 +1,200 @@
+# swift_sessions.py — one recording file per session plus a small catalog
+#
+# Every user-initiated connection gets its own JSONL file under
+# SESSIONS_DIR (automatic reconnects keep appending to the same one).
+# catalog.json holds one summary row per session — device, start/end,
+# sample count, dose range, link quality — updated incrementally as samples arrive, so
+# the UI can list and export history without reading any recording.
+
+import json
+import threading
+import datetime
+import swift_shared
+
+from swift_shared import logging
+
+
+CATALOG_FLUSH_EVERY = 30       # samples between catalog rewrites (~60 s)
+
+_lock    = threading.Lock()
+_catalog = None                # id -> catalog entry, loaded from disk once
+_current = None                # catalog entry of the open session
+_file    = None                # open handle of the open session's JSONL
+_pending = 0                   # samples since the last catalog flush
+
+
+def _summarise_legacy(path) -> dict:
+    """Catalog row for the single recording.jsonl written by older versions."""
+    mtime = datetime.datetime.fromtimestamp(path.stat().st_mtime)
+    e = {
+        "id": f"{mtime:%Y%m%d_%H%M%S}_LEGACY", "device": "Unknown (legacy)", "address": "",
+        "samples": 0, "dose_start": None, "dose_end": None, "min_dose": None,
+        "max_dose": None, "total_dose": 0.0, "max_cps": None, "missed": 0, "legacy": True,
+    }
+    e["file"] = f"{e['id']}.jsonl"
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(row, dict):
+                continue
+            e["samples"] += 1
+            dose, cps = row.get("dose"), row.get("cps")
+            if isinstance(dose, (int, float)):
+                e["dose_start"] = dose if e["dose_start"] is None else e["dose_start"]
+                e["dose_end"]   = dose
+                e["min_dose"]   = dose if e["min_dose"] is None else min(e["min_dose"], dose)
+                e["max_dose"]   = dose if e["max_dose"] is None else max(e["max_dose"], dose)
+            if isinstance(cps, (int, float)):
+                e["max_cps"] = cps if e["max_cps"] is None else max(e["max_cps"], cps)
+    if e["dose_start"] is not None:
+        e["total_dose"] = max(0.0, e["dose_end"] - e["dose_start"])
+    # Rows only carry HH:MM:SS; estimate the start from 2-s samples
+    e["end"]   = mtime.isoformat(timespec="seconds")
+    e["start"] = (mtime - datetime.timedelta(seconds=2 * e["samples"])).isoformat(timespec="seconds")
+    return e
+
+
+def _load_catalog() -> dict:
+    """The catalog, read from disk on first use and kept in memory after."""
+    global _catalog
+    if _catalog is not None:
+        return _catalog
+    try:
+        entries = json.loads(swift_shared.CATALOG_PATH.read_text(encoding="utf-8"))
+        _catalog = {e["id"]: e for e in entries}
+        return _catalog
+    except FileNotFoundError:
+        _catalog = {}
+    except Exception as e:
+        logging.warning(f"[sessions] Catalog unreadable, starting fresh: {e}")
+        _catalog = {}
+        return _catalog
+
+    # First catalog on this install: adopt the old single recording once
+    legacy = swift_shared.LEGACY_SESSION_LOG
+    try:
+        if legacy.exists() and legacy.stat().st_size:
+            entry = _summarise_legacy(legacy)
+            legacy.replace(swift_shared.SESSIONS_DIR / entry["file"])
+            _catalog[entry["id"]] = entry
+            logging.info(f"[sessions] Imported {legacy} as legacy session {entry['id']}")
+    except Exception as e:
+        logging.warning(f"[sessions] Could not import {legacy}: {e}")
+    _write_catalog(list(_catalog.values()))
+    return _catalog
+
+
+def _write_catalog(entries: list[dict]) -> None:
+    # Write-then-rename so readers never see a half-written catalog
+    tmp = swift_shared.CATALOG_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+    tmp.replace(swift_shared.CATALOG_PATH)
+
+
+def _flush_current() -> None:
+    global _pending
+    import swift_connect    # imported here: swift_connect imports this module
+    _current["link"] = swift_connect.link_summary(_current["address"])
+    catalog = _load_catalog()
+    catalog[_current["id"]] = dict(_current)
+    _write_catalog(list(catalog.values()))
+    _pending = 0
+
+
+# ------------------------------------------------------------------
+
+def start_session(device: str, address: str) -> str:
+    """Close any open session, open a new recording for *device* and return its id."""
+    global _current, _file, _pending
+    end_session()
+
+    now   = datetime.datetime.now()
+    short = address.replace(":", "")[-6:].upper() or "NOADDR"
+    sid   = f"{now:%Y%m%d_%H%M%S}_{short}"
+
+    with _lock:
+        _current = {
+            "id"         : sid,
+            "file"       : f"{sid}.jsonl",
+            "device"     : device,
+            "address"    : address,
+            "start"      : now.isoformat(timespec="seconds"),
+            "end"        : None,
+            "samples"    : 0,
+            "dose_start" : None,
+            "dose_end"   : None,
+            "min_dose"   : None,
+            "max_dose"   : None,
+            "total_dose" : 0.0,
+            "max_cps"    : None,
+            "missed"     : 0,
+        }
+        _file = open(swift_shared.SESSIONS_DIR / _current["file"], "a", encoding="utf-8")
+        _flush_current()
+
+    logging.info(f"[sessions] Started session {sid} for {device}")
+    return sid
+
+
+def append(sample: dict) -> None:
+    """Append one sample to the open session and update its summary."""
+    global _pending
+    with _lock:
+        if _current is None:
+            return
+        _file.write(json.dumps(sample) + "\n")
+        _file.flush()
+
+        e    = _current
+        dose = sample.get("dose")
+        cps  = sample.get("cps")
+        e["samples"] += 1
+        e["end"]      = datetime.datetime.now().isoformat(timespec="seconds")
+        if isinstance(dose, (int, float)):
+            if e["dose_start"] is None:
+                e["dose_start"] = dose
+            e["dose_end"]   = dose
+            e["min_dose"]   = dose if e["min_dose"] is None else min(e["min_dose"], dose)
+            e["max_dose"]   = dose if e["max_dose"] is None else max(e["max_dose"], dose)
+            e["total_dose"] = max(0.0, e["dose_end"] - e["dose_start"])
+        if isinstance(cps, (int, float)):
+            e["max_cps"] = cps if e["max_cps"] is None else max(e["max_cps"], cps)
+        e["missed"] = sample.get("missed_total", e["missed"])
+
+        _pending += 1
+        if _pending >= CATALOG_FLUSH_EVERY:
+            _flush_current()
+
+
+def end_session(sid: str | None = None) -> None:
+    """Close the open session, if any, and write its final catalog row.
+
+    With *sid*, only that session is closed, so a connection that ends late
+    cannot close a session another connection has since started.
+    """
+    global _current, _file
+    with _lock:
+        if _current is None or (sid is not None and _current["id"] != sid):
+            return
+        _current["end"] = datetime.datetime.now().isoformat(timespec="seconds")
+        _flush_current()
+        _file.close()
+        logging.info(f"[sessions] Closed session {_current['id']} ({_current['samples']} samples)")
+        _current = None
+        _file    = None
+
+
+def list_sessions() -> list[dict]:
+    """All sessions, newest first; the open session reflects live totals."""
+    with _lock:
+        entries = dict(_load_catalog())
+        if _current is not None:
+            entries[_current["id"]] = dict(_current)
+    return sorted(entries.values(), key=lambda e: e["start"], reverse=True)
+
+
+def session_path(entry: dict):
+    return swift_shared.SESSIONS_DIR / entry["file"]
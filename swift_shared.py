@@ -2,16 +2,21 @@
 
 import os
 import csv
+import time
+import queue
+import atexit
 import datetime
 import platform
 import logging
+import logging.handlers
 from pathlib import Path
+from collections import deque
 
 # Shared state
 version                 = "2.0.4"
 is_connected            = False
 connection_status       = "idle"   # default at program start
-latest_data             = {"data": {}, "timestamps": [], "cps_history": []}
+latest_data             = {"data": {}, "timestamps": deque(maxlen=150), "cps_history": deque(maxlen=150)}  # last 300 s
 is_recording            = False    # are we capturing rows right now?
 csv_rows: list[str]     = []       # each element is already a CSV-formatted line
 stop_request            = False    # set True to break BLE loop
@@ -21,6 +26,12 @@ selected_device_name    = ""
 scan_done               = False
 is_connected            = False
 connecting              = False
+link_stats: dict        = {}       # per-device link quality, keyed by address
+sample_listeners: list  = []       # callables fed each decoded sample (BLE thread)
+alarm_listeners: list   = []       # callables fed alarm/clear events (BLE thread)
+alarm_false_per_day     = os.getenv("ATOMCONNECT_FALSE_ALARMS_PER_DAY")  # CPS alarm target; checked in swift_alarm
+alarm_step_ratio        = os.getenv("ATOMCONNECT_ALARM_STEP_RATIO")      # step it is tuned for; checked in swift_alarm
+stream_port             = int(os.getenv("ATOMCONNECT_STREAM_PORT", "0") or 0)  # 0 = LAN stream off
 
 
 ## Application identity
@@ -43,17 +54,93 @@ else:
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 # ===========================
-# Log file: last-run.log
+# Log file: atomconnect.log (+ rotated .1 … .5)
 # ===========================
+#
+# Callers (GUI, scan and BLE threads) only put records on a bounded queue;
+# a QueueListener thread does the file I/O. If the queue is full the record
+# is dropped rather than blocking packet handling.
+
+log_path         = LOG_DIR / "atomconnect.log"
+LOG_MAX_BYTES    = 1_000_000
+LOG_BACKUPS      = 5
+LOG_QUEUE_SIZE   = 10_000
+LOG_REPEAT_SEC   = 30      # a rate-limited message is logged at most this often
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+
+class _RepeatFilter(logging.Filter):
+    """Opt-in rate limiting for repetitive messages.
+
+    Only records logged with extra={"rate_key": ...} are limited: per key,
+    one is let through every LOG_REPEAT_SEC, tagged with how many were
+    skipped in between. Everything else passes untouched.
+    """
+
+    def __init__(self, interval: float = LOG_REPEAT_SEC) -> None:
+        super().__init__()
+        self.interval = interval
+        self.seen: dict[str, list] = {}     # rate_key -> [last_emit_time, suppressed]
+
+    def filter(self, record) -> bool:
+        key = getattr(record, "rate_key", None)
+        if key is None:
+            return True
+        now  = time.monotonic()
+        slot = self.seen.get(key)
+        if slot is None or now - slot[0] >= self.interval:
+            if slot and slot[1]:
+                record.msg = f"{record.msg} (+{slot[1]} similar suppressed)"
+            self.seen[key] = [now, 0]
+            return True
+        slot[1] += 1
+        return False
+
+    def pending(self) -> dict[str, int]:
+        return {key: slot[1] for key, slot in self.seen.items() if slot[1]}
+
+
+_file_handler = logging.handlers.RotatingFileHandler(
+    log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+)
+_file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
 
-log_path = LOG_DIR / "last-run.log"
+_log_queue     = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_queue_handler = _DroppingQueueHandler(_log_queue)
+_repeat_filter = _RepeatFilter()
+_queue_handler.addFilter(_repeat_filter)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))   # real format on the file handler
 
-logging.basicConfig(
-    filename=log_path,
-    filemode="w",  # overwrite each run
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-)
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+
+log_listener = logging.handlers.QueueListener(_log_queue, _file_handler)
+log_listener.start()
+
+
+def _stop_logging() -> None:
+    # Drain the queue, then write what would otherwise be lost silently
+    log_listener.stop()
+    notes = [f"{n} '{key}' message(s) suppressed since the last one logged"
+             for key, n in _repeat_filter.pending().items()]
+    if _DroppingQueueHandler.dropped:
+        notes.append(f"{_DroppingQueueHandler.dropped} log record(s) dropped, queue full")
+    for note in notes:
+        _file_handler.handle(logging.makeLogRecord(
+            {"msg": note, "levelno": logging.WARNING, "levelname": "WARNING"}
+        ))
+    _file_handler.close()
+
+
+atexit.register(_stop_logging)
 
 logging.info("=== AtomConnect started ===")
 
@@ -70,5 +157,10 @@ else:
 
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-SESSION_LOG = DATA_DIR / "recording.jsonl"
+SESSIONS_DIR = DATA_DIR / "sessions"      # one <id>.jsonl per session
+SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
+
+CATALOG_PATH = SESSIONS_DIR / "catalog.json"
+
+LEGACY_SESSION_LOG = DATA_DIR / "recording.jsonl"   # single recording of older versions
 
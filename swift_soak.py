@@ -0,0 +1,229 @@
+# swift_soak.py — long-run soak test for memory, handle and latency growth
+#
+#   python swift_soak.py [--days 14] [--checkpoint-days 1] [--no-tracemalloc]
+#
+# Feeds synthetic 13-byte packets through the full pipeline —
+# swift_connect._handle_notification (decode, link stats, alarm, session
+# recording, listeners) into DisplayWindow.update_data and redraw on an
+# offscreen Qt platform — as fast as it will go, i.e. days of 2-s samples
+# in minutes. Arrival times come from a simulated 2-s clock, and a few
+# packets are deliberately dropped or corrupted so the gap and
+# invalid-packet paths run too. At every checkpoint it samples RSS, open
+# file descriptors, tracemalloc totals and callback latency, and exits
+# non-zero if any of them grew past its threshold after warm-up, or if
+# the link stats miscount the dropped and corrupted packets.
+#
+# All app data goes to a throw-away directory, never the real data folder;
+# it is deleted at the end unless --keep is given.
+
+import os
+import sys
+import math
+import time
+import random
+import shutil
+import struct
+import tempfile
+import argparse
+import tracemalloc
+
+# Isolate DATA_DIR / LOG_DIR before swift_shared is imported
+_TMP = tempfile.mkdtemp(prefix="atomconnect-soak-")
+os.environ["HOME"]    = _TMP
+os.environ["APPDATA"] = _TMP
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import swift_shared
+import swift_connect
+import swift_sessions
+
+from swift_shared import logging
+from PySide6.QtWidgets import QApplication
+from swift_2 import DisplayWindow
+
+
+SAMPLES_PER_DAY = 86400 // 2
+DROP_EVERY      = 997        # withhold one packet in this many (a missed sample)
+CORRUPT_EVERY   = 1499       # send a short, invalid packet this often
+
+
+def _rss_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource     # peak, not current, but still catches growth
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def _open_fds() -> int:
+    try:
+        import psutil
+        p = psutil.Process()
+        return p.num_fds() if hasattr(p, "num_fds") else p.num_handles()
+    except ImportError:
+        pass
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+def _packet(i: int, dose: float, rng: random.Random) -> bytes:
+    # Background of ~10 cps with a short step every simulated 6 h
+    rate   = 10.0 * (3.0 if (i % 10800) < 30 else 1.0)
+    counts = max(0, int(rng.gauss(rate * 2, math.sqrt(rate * 2))))
+    battery = 100 - (i // 2000) % 100
+    temp    = 20 + (i // 500) % 10
+    return (bytes([0]) + struct.pack("<f", dose) + struct.pack("<f", 0.1)
+            + counts.to_bytes(2, "little") + bytes([battery, temp]))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Soak the AtomConnect pipeline.")
+    parser.add_argument("--days", type=float, default=14, help="simulated days to run")
+    parser.add_argument("--checkpoint-days", type=float, default=1, help="simulated days between checkpoints")
+    parser.add_argument("--warmup-days", type=float, default=1, help="growth is measured from this point")
+    parser.add_argument("--redraw-every", type=int, default=1, help="redraw after every N samples")
+    parser.add_argument("--max-rss-mb", type=float, default=50, help="allowed RSS growth (MB)")
+    parser.add_argument("--max-traced-mb", type=float, default=10, help="allowed tracemalloc growth (MB)")
+    parser.add_argument("--max-fds", type=int, default=5, help="allowed growth in open file descriptors")
+    parser.add_argument("--max-latency-ratio", type=float, default=3.0, help="allowed p99 callback latency growth")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip tracemalloc (runs ~2× faster)")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary data directory")
+    args = parser.parse_args(argv)
+
+    try:
+        return _soak(args)
+    finally:
+        if args.keep:
+            print(f"Data kept in {_TMP}")
+        else:
+            shutil.rmtree(_TMP, ignore_errors=True)
+
+
+def _soak(args) -> int:
+    total      = int(args.days * SAMPLES_PER_DAY)
+    checkpoint = max(1, int(args.checkpoint_days * SAMPLES_PER_DAY))
+    warmup     = int(args.warmup_days * SAMPLES_PER_DAY)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    win = DisplayWindow()
+    win.show()
+
+    clock = [0.0]                         # simulated seconds since start
+    swift_connect.link_clock = lambda: clock[0]
+
+    address = swift_shared.selected_device_address = "SO:AK:00:00:00:01"
+    swift_connect.reset_link_stats(address)
+    session_id = swift_sessions.start_session("AtomSoak", swift_shared.selected_device_address)
+
+    if not args.no_tracemalloc:
+        tracemalloc.start(10)
+
+    rng       = random.Random(1)
+    dose      = 0.0
+    latencies = []
+    baseline  = None
+    failures  = []
+    dropped   = 0
+    corrupted = 0
+
+    print(f"Soak: {total} samples ({args.days:g} days) in {_TMP}", flush=True)
+    started = time.perf_counter()
+
+    for i in range(1, total + 1):
+        dose     += 1e-6
+        clock[0] += 2.0
+        packet = _packet(i, dose, rng)
+
+        if i % CORRUPT_EVERY == 0:
+            swift_connect._handle_notification(0, bytearray(packet[:12]))
+            corrupted += 1
+
+        if i % DROP_EVERY == 0 and i != total:
+            dropped += 1                  # never delivered: the next arrival shows a gap
+        else:
+            t0 = time.perf_counter()
+            swift_connect._handle_notification(0, bytearray(packet))
+            latencies.append(time.perf_counter() - t0)
+
+        app.processEvents()               # deliver the queued sample to the window
+        if i % args.redraw_every == 0:
+            win.redraw()
+
+        if i % checkpoint and i != total:
+            continue
+
+        # ---- checkpoint --------------------------------------------
+        snap = {
+            "day"    : i / SAMPLES_PER_DAY,
+            "rss"    : _rss_mb(),
+            "fds"    : _open_fds(),
+            "p50_ms" : _percentile(latencies, 0.50) * 1e3,
+            "p99_ms" : _percentile(latencies, 0.99) * 1e3,
+            "max_ms" : max(latencies) * 1e3,
+            "traced" : tracemalloc.get_traced_memory()[0] / 1e6 if tracemalloc.is_tracing() else 0.0,
+        }
+        latencies = []
+        print(f"day {snap['day']:6.2f}  rss {snap['rss']:7.1f} MB  traced {snap['traced']:6.2f} MB  "
+              f"fds {snap['fds']:4d}  latency p50 {snap['p50_ms']:.3f} / p99 {snap['p99_ms']:.3f} / "
+              f"max {snap['max_ms']:.1f} ms  ({time.perf_counter() - started:.0f} s)", flush=True)
+
+        if baseline is None and i >= warmup:
+            baseline = snap
+            if tracemalloc.is_tracing():
+                base_trace = tracemalloc.take_snapshot()
+
+    # ---- verdict ---------------------------------------------------
+    swift_sessions.end_session(session_id)
+
+    link = swift_connect.link_summary(address)
+    print(f"link: {link['missed']} missed / {dropped} dropped, "
+          f"{link['invalid']} invalid / {corrupted} corrupted, {link['completeness']}% complete")
+    if link["missed"] != dropped:
+        failures.append(f"{link['missed']} missed samples detected, {dropped} dropped")
+    if link["invalid"] != corrupted:
+        failures.append(f"{link['invalid']} invalid packets counted, {corrupted} sent")
+    if baseline is None:
+        print("Run shorter than warm-up; no growth to compare.")
+        baseline = snap
+
+    if snap["rss"] - baseline["rss"] > args.max_rss_mb:
+        failures.append(f"RSS grew {snap['rss'] - baseline['rss']:.1f} MB")
+    if snap["traced"] - baseline["traced"] > args.max_traced_mb:
+        failures.append(f"traced memory grew {snap['traced'] - baseline['traced']:.2f} MB")
+    if baseline["fds"] >= 0 and snap["fds"] - baseline["fds"] > args.max_fds:
+        failures.append(f"open file descriptors grew by {snap['fds'] - baseline['fds']}")
+    if baseline["p99_ms"] > 0 and snap["p99_ms"] / baseline["p99_ms"] > args.max_latency_ratio:
+        failures.append(f"p99 latency grew {snap['p99_ms'] / baseline['p99_ms']:.1f}×")
+
+    if tracemalloc.is_tracing() and baseline is not snap:
+        print("\nTop allocation growth since warm-up:")
+        for stat in tracemalloc.take_snapshot().compare_to(base_trace, "lineno")[:10]:
+            print(f"  {stat}")
+
+    win.close()
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        logging.warning(f"[soak] FAIL: {failures}")
+        return 1
+    print("\nPASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
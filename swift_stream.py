@@ -0,0 +1,195 @@
+# swift_stream.py — optional LAN live stream (Server-Sent Events)
+#
+# Each decoded sample is encoded once and fanned out to every connected
+# viewer. Viewers get the recent history on connect, then only the fields
+# that changed since the previous sample. A viewer whose queue fills up
+# loses its backlog and is resynchronised with a full keyframe, so one slow
+# screen never holds up the BLE thread or the other viewers. A viewer that
+# stops reading (drain timeout) or keeps falling behind (MAX_RESYNCS) is
+# disconnected so its socket buffers are released.
+#
+# Stdlib only (asyncio streams); browsers consume it with EventSource.
+
+import asyncio
+import json
+import threading
+import swift_shared
+
+from collections import deque
+from swift_shared import logging
+
+
+HISTORY_PTS    = 150     # 300 s at one sample per 2 s, same as DisplayWindow
+CLIENT_QUEUE   = 32      # messages buffered per viewer before it is resynced
+HEADER_TIMEOUT = 10      # seconds allowed for the request line and headers
+KEEPALIVE_SEC  = 15      # comment line to keep idle proxies from closing us
+DRAIN_TIMEOUT  = 10      # seconds a viewer may take to accept buffered data
+MAX_RESYNCS    = 100     # a viewer this far behind is disconnected
+
+_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>AtomConnect live</title>
+<style>body{font-family:sans-serif;margin:2em}td{padding:4px 12px}
+#a{display:none;background:#c00;color:#fff;padding:8px}</style></head>
+<body><h2>AtomConnect v%s — live</h2><div id="a">ALARM</div><table id="t"></table>
+<script>
+let s={};const t=document.getElementById("t");
+function show(){t.innerHTML=Object.entries(s).map(([k,v])=>`<tr><td>${k}</td><td>${v}</td></tr>`).join("");
+document.getElementById("a").style.display=s.alarm?"block":"none";}
+const es=new EventSource("/stream");
+es.addEventListener("h",e=>{const h=JSON.parse(e.data);if(h.length)s=h[h.length-1];show();});
+es.addEventListener("k",e=>{s=JSON.parse(e.data);show();});
+es.addEventListener("d",e=>{Object.assign(s,JSON.parse(e.data));show();});
+</script></body></html>
+"""
+
+
+def _sse(event: str, payload) -> bytes:
+    data = json.dumps(payload, separators=(",", ":"))
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+class _Client:
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer  = writer
+        self.queue   = asyncio.Queue(maxsize=CLIENT_QUEUE)
+        self.resyncs = 0
+        self.dropped = False     # set by _fanout once the viewer is given up on
+
+
+class StreamServer:
+    """Publishes samples to any number of LAN viewers over HTTP/SSE."""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8765) -> None:
+        self.host    = host
+        self.port    = port
+        self.loop    = None
+        self.server  = None
+        self.clients: set[_Client] = set()
+        self.history = deque(maxlen=HISTORY_PTS)   # full samples, for catch-up
+        self.last: dict = {}                        # previous sample, for deltas
+
+    # ---------------------------------------------------------------
+    def start(self) -> None:
+        """Run the server on its own event loop in a daemon thread."""
+        ready = threading.Event()
+
+        def _run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.server = self.loop.run_until_complete(
+                    asyncio.start_server(self._handle, self.host, self.port)
+                )
+            except OSError as e:
+                logging.warning(f"[stream] Could not listen on {self.host}:{self.port}: {e}")
+                ready.set()
+                return
+            logging.info(f"[stream] Serving live data on http://{self.host}:{self.port}/")
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=_run, daemon=True).start()
+        ready.wait(timeout=5)
+        if self.server is not None:
+            swift_shared.sample_listeners.append(self.publish)
+
+    def stop(self) -> None:
+        try:
+            swift_shared.sample_listeners.remove(self.publish)
+        except ValueError:
+            pass
+        if self.loop and self.server:
+            self.loop.call_soon_threadsafe(self.server.close)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # ---------------------------------------------------------------
+    def publish(self, sample: dict) -> None:
+        """Sample listener; called on the BLE thread, never blocks."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._fanout, dict(sample))
+
+    def _fanout(self, sample: dict) -> None:
+        delta     = {k: v for k, v in sample.items() if self.last.get(k) != v}
+        self.last = sample
+        self.history.append(sample)
+        msg = _sse("d", delta)      # encoded once for all viewers
+
+        for client in self.clients:
+            if client.dropped:
+                continue
+            try:
+                client.queue.put_nowait(msg)
+            except asyncio.QueueFull:
+                # Slow viewer: drop its backlog and resync with a keyframe
+                while not client.queue.empty():
+                    client.queue.get_nowait()
+                client.queue.put_nowait(_sse("k", sample))
+                client.resyncs += 1
+                if client.resyncs >= MAX_RESYNCS:
+                    # Wake _stream with the sentinel so it closes the viewer
+                    client.dropped = True
+                    client.queue.get_nowait()
+                    client.queue.put_nowait(None)
+                    logging.info(f"[stream] Dropping viewer after {client.resyncs} resyncs")
+                elif client.resyncs in (1, 10):
+                    logging.info(f"[stream] Slow viewer resynced {client.resyncs}×")
+
+    # ---------------------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # One deadline covers the request line and all headers, so a
+            # client that stalls mid-request cannot hold a connection open
+            request = await asyncio.wait_for(self._read_request(reader), timeout=HEADER_TIMEOUT)
+            parts = request.decode("latin-1").split()
+            path  = parts[1] if len(parts) > 1 else "/"
+
+            if path.startswith("/stream"):
+                await self._stream(writer)
+            elif path == "/":
+                body = (_PAGE % swift_shared.version).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                             b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body)
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await asyncio.wait_for(writer.drain(), timeout=DRAIN_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            pass                                      # ValueError: oversized header line
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> bytes:
+        request = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass                                      # skip headers
+        return request
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\n\r\n")
+        writer.write(_sse("h", list(self.history)))
+
+        client = _Client(writer)
+        self.clients.add(client)
+        logging.info(f"[stream] Viewer connected ({len(self.clients)} total)")
+        try:
+            await asyncio.wait_for(writer.drain(), timeout=DRAIN_TIMEOUT)
+            while True:
+                try:
+                    msg = await asyncio.wait_for(client.queue.get(), timeout=KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    msg = b": keepalive\n\n"
+                if msg is None:
+                    writer.transport.abort()          # dropped by _fanout
+                    break
+                writer.write(msg)
+                await asyncio.wait_for(writer.drain(), timeout=DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            # close() would wait for the stalled buffer to flush; abort frees it
+            logging.info(f"[stream] Dropping viewer that stopped reading for {DRAIN_TIMEOUT} s")
+            writer.transport.abort()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(client)
+            logging.info(f"[stream] Viewer disconnected ({len(self.clients)} total)")